@@ -1,6 +1,7 @@
 from abc import ABC
 from dataclasses import dataclass, field
 from typing import Callable, Optional
+from weakref import WeakValueDictionary
 
 from .ctx import Ctx
 from .runtime import LoxFunction, LoxReturn, LoxClass, LoxError, LoxInstance, print as lox_print
@@ -15,6 +16,15 @@ RESERVED_WORDS = {
     "or", "print", "return", "super", "this", "true", "var", "while"
 }
 
+# Programas que já passaram pela validação semântica, indexados por id().
+# Usamos referências fracas para que a entrada desapareça junto com o
+# programa e o id() não seja reaproveitado por outro objeto.
+_VALIDATE_CACHE: WeakValueDictionary[int, "Program"] = WeakValueDictionary()
+
+# Marca a ausência de um valor em buscas com Ctx.get(), já que None é um
+# valor válido (nil) em Lox.
+_MISSING = object()
+
 # TIPOS BÁSICOS
 
 Value = bool | str | float | None
@@ -32,8 +42,25 @@ class Program(Node):
     stmts: list[Stmt]
 
     def eval(self, ctx: Ctx):
-        for stmt in self.stmts:
-            stmt.eval(ctx)
+        # Programas são compilados para closures antes de executar. Os demais
+        # nós continuam sendo avaliados diretamente pelo método eval.
+        # (importado aqui para evitar importação circular)
+        from .compiler import compile_program
+
+        run = compile_program(self)
+        run(ctx)
+
+    def validate_tree(self):
+        """
+        Valida o programa, exceto se ele já tiver sido validado antes.
+
+        Funções como lox.eval() validam novamente a árvore produzida por
+        parse(), que já foi validada.
+        """
+        if _VALIDATE_CACHE.get(id(self)) is self:
+            return
+        super().validate_tree()
+        _VALIDATE_CACHE[id(self)] = self
 
 # EXPRESSÕES
 
@@ -54,11 +81,18 @@ class Var(Expr):
     """Uma variável no código."""
     name: str
 
+    # Endereço (profundidade, slot) preenchido por lox.resolver. Variáveis
+    # globais não são resolvidas e mantêm slot = None. Em `forward` ficam os
+    # endereços de declarações que talvez ainda não tenham sido executadas.
+    depth = None
+    slot = None
+    forward = ()
+
     def eval(self, ctx: Ctx):
-        try:
-            return ctx[self.name]
-        except KeyError:
+        value = ctx.get(self.name, _MISSING)
+        if value is _MISSING:
             raise NameError(f"variável {self.name} não existe!")
+        return value
 
     # Validação Semântica para Var
     def validate_self(self, cursor: Cursor):
@@ -124,8 +158,6 @@ class Or(Expr):
     def eval(self, ctx: Ctx):
         left_val = self.left.eval(ctx)
         if left_val is not False and left_val is not None:
-            if isinstance(left_val, float) and left_val == 0: return left_val
-            if isinstance(left_val, str) and left_val == "": return left_val
             return left_val
         return self.right.eval(ctx)
 
@@ -159,10 +191,10 @@ class This(Expr):
     _dummy: None = field(default=None, init=False)
     
     def eval(self, ctx: Ctx):
-        try:
-            return ctx["this"]
-        except KeyError:
-            raise NameError(f"variável this não existe!")
+        instance = ctx.get("this", _MISSING)
+        if instance is _MISSING:
+            raise NameError("variável this não existe!")
+        return instance
 
     # Validação Semântica para This
     def validate_self(self, cursor: Cursor):
@@ -179,22 +211,17 @@ class Super(Expr):
     name: str
 
     def eval(self, ctx: Ctx):
-        try:
-            # Procura a instância atual (this) no contexto
-            instance = ctx['this']
-            # Procura a superclasse no contexto
-            superclass = ctx['super']
-            # Busca o método na superclasse
-            method = superclass.get_method(self.name)
-            # Retorna o método ligado à instância
-            return method.bind(instance)
-        except KeyError as e:
-            if 'this' in str(e):
-                raise NameError(f"variável this não existe!")
-            elif 'super' in str(e):
-                raise NameError(f"variável super não existe!")
-            else:
-                raise
+        # Procura a instância atual (this) no contexto
+        instance = ctx.get("this", _MISSING)
+        if instance is _MISSING:
+            raise NameError("variável this não existe!")
+        # Procura a superclasse no contexto
+        superclass = ctx.get("super", _MISSING)
+        if superclass is _MISSING:
+            raise NameError("variável super não existe!")
+        # Busca o método na superclasse e o associa à instância
+        method = superclass.get_method(self.name)
+        return method.bind(instance)
 
     # Validação Semântica para Super
     def validate_self(self, cursor: Cursor):
@@ -228,6 +255,11 @@ class Assign(Expr):
     name: str
     value: Expr
 
+    # Endereço (profundidade, slot) preenchido por lox.resolver, como em Var.
+    depth = None
+    slot = None
+    forward = ()
+
     def eval(self, ctx: Ctx):
         result = self.value.eval(ctx)
         ctx.assign(self.name, result)
@@ -242,12 +274,15 @@ class Getattr(Expr):
     def eval(self, ctx: Ctx):
         obj_value = self.obj.eval(ctx)
         # Se for uma instância de LoxClass, buscar método corretamente
-        from .runtime import LoxClass
         if isinstance(obj_value, LoxClass):
             try:
                 return obj_value.get_method(self.name)
             except Exception:
                 raise AttributeError(f"O objeto {obj_value} não possui o atributo '{self.name}'")
+        # Campos de instâncias Lox não passam por getattr(), para que nomes
+        # como `fields` e `klass` não devolvam os atributos do Python.
+        if isinstance(obj_value, LoxInstance):
+            return obj_value.get_field(self.name)
         try:
             return getattr(obj_value, self.name)
         except AttributeError:
@@ -265,12 +300,10 @@ class Setattr(Expr):
         val = self.value.eval(ctx)
         
         # Bloqueia setattr em classes e funções Lox
-        from .runtime import LoxClass, LoxFunction
         if isinstance(obj_val, (LoxClass, LoxFunction)):
             raise LoxError("Apenas instâncias podem ter campos.")
         
         # Para LoxInstance, usa o método set_field
-        from .runtime import LoxInstance
         if isinstance(obj_val, LoxInstance):
             obj_val.set_field(self.name, val)
         else:
@@ -339,6 +372,9 @@ class VarDef(Stmt):
     name: str
     initializer: Expr
 
+    # Slot no frame local preenchido por lox.resolver (None no escopo global).
+    slot = None
+
     def eval(self, ctx: Ctx):
         value = self.initializer.eval(ctx)
         ctx.var_def(self.name, value)
@@ -384,6 +420,9 @@ class Block(Node):
     """Representa um bloco de comandos."""
     stmts: list[Stmt]
 
+    # Número de variáveis declaradas no bloco, preenchido por lox.resolver.
+    n_slots = 0
+
     def eval(self, ctx: Ctx):
         new_ctx = ctx.push({})
         for stmt in self.stmts:
@@ -409,9 +448,18 @@ class Function(Stmt):
     params: list[Var]
     body: Block
 
+    # Preenchidos por lox.resolver: slot do nome da função no frame onde ela
+    # é declarada e o número de parâmetros e variáveis locais do corpo.
+    slot = None
+    n_slots = 0
+
+    def __post_init__(self):
+        # Nomes dos parâmetros, calculados uma única vez para todas as
+        # execuções da declaração.
+        self._param_names = tuple(p.name for p in self.params)
+
     def eval(self, ctx: Ctx):
-        param_names = [p.name for p in self.params]
-        function = LoxFunction(self.name, param_names, self.body, ctx)
+        function = LoxFunction(self.name, self._param_names, self.body, ctx)
         ctx.var_def(self.name, function)
         return None
 
@@ -423,23 +471,27 @@ class Function(Stmt):
         1. Parâmetros com nomes duplicados.
         2. Variáveis no corpo que sombreiam parâmetros.
         """
-        # 0. (NOVO) Verifica se algum parâmetro usa uma palavra reservada
-        for param in self.params:
-            if param.name in RESERVED_WORDS:
-                raise SemanticError(
-                    f"Cannot use reserved word '{param.name}' as a parameter name.",
-                    token=param.name
-                )
-        
-        # 1. Verifica parâmetros duplicados
+        # 0 e 1. Verifica palavras reservadas e parâmetros duplicados numa
+        # única passada. Nomes reservados têm prioridade, então o erro de
+        # duplicata só é lançado depois de examinar todos os parâmetros.
         param_names = set()
+        duplicate = None
         for param in self.params:
-            if param.name in param_names:
+            name = param.name
+            if name in RESERVED_WORDS:
                 raise SemanticError(
-                    f"Duplicate parameter name '{param.name}' in function declaration.",
-                    token=param.name
+                    f"Cannot use reserved word '{name}' as a parameter name.",
+                    token=name
                 )
-            param_names.add(param.name)
+            if name in param_names and duplicate is None:
+                duplicate = name
+            param_names.add(name)
+
+        if duplicate is not None:
+            raise SemanticError(
+                f"Duplicate parameter name '{duplicate}' in function declaration.",
+                token=duplicate
+            )
 
         # 2. Verifica se uma variável declarada no corpo tem o mesmo nome de um parâmetro
         for stmt in self.body.stmts:
@@ -457,6 +509,9 @@ class Class(Stmt):
     methods: list["Function"]
     base: Optional[Var]
 
+    # Slot do nome da classe preenchido por lox.resolver.
+    slot = None
+
     def eval(self, ctx: Ctx):
         # Carrega a superclasse, caso exista
         superclass = None
@@ -477,10 +532,8 @@ class Class(Stmt):
         methods = {}
         for method in self.methods:
             method_name = method.name
-            method_body = method.body
-            method_args = [p.name for p in method.params]
             # Usa o contexto correto que pode incluir 'super'
-            method_impl = LoxFunction(method_name, method_args, method_body, method_ctx)
+            method_impl = LoxFunction(method_name, method._param_names, method.body, method_ctx)
             methods[method_name] = method_impl
 
         # Cria a classe e a define no contexto
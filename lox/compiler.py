@@ -0,0 +1,898 @@
+"""
+Compila a árvore sintática para closures Python.
+
+Em vez de percorrer a árvore chamando `eval` em cada nó, o compilador visita
+o programa uma única vez e converte cada nó em uma função Python com a
+assinatura `run(f, ctx)`, onde:
+
+    f:
+        Frame local corrente. É uma lista cujo primeiro elemento é o frame
+        pai e os demais são os valores das variáveis locais. No escopo global,
+        f é None.
+    ctx:
+        Contexto `Ctx` com as variáveis globais, builtins e os nomes especiais
+        `this` e `super`.
+
+Comandos compilados retornam None para que a execução continue no próximo
+comando. O comando `return` retorna o valor da função, ou `NIL` quando esse
+valor é nil, e os comandos compostos repassam esse resultado até o corpo da
+função. Assim, retornar de uma função não precisa levantar exceções.
+
+Antes da compilação, o programa passa pelo `lox.resolver`, que associa cada
+variável local a um endereço (profundidade, slot). Assim, ler uma variável
+local vira uma indexação de lista em vez de uma busca por nome na pilha de
+dicionários do `Ctx`. Variáveis globais continuam sendo buscadas por nome.
+
+Além disso, laços while puramente numéricos são especializados pelo `lox.trace`.
+"""
+
+import operator
+from functools import singledispatch
+from typing import Callable, Optional
+
+from .ast import (
+    And,
+    Assign,
+    BinOp,
+    Block,
+    Call,
+    Class,
+    Expr,
+    ExprStmt,
+    Function,
+    Getattr,
+    If,
+    Literal,
+    Or,
+    Print,
+    Program,
+    Return,
+    Setattr,
+    Stmt,
+    Super,
+    This,
+    UnaryOp,
+    Var,
+    VarDef,
+    While,
+)
+from .ctx import Ctx
+from .node import Node
+from .resolver import resolve
+from .runtime import (
+    LoxClass,
+    LoxError,
+    LoxFunction,
+    LoxInstance,
+    add,
+    eq,
+    ge,
+    gt,
+    le,
+    lt,
+    mul,
+    ne,
+    not_,
+    print as lox_print,
+    sub,
+)
+from .trace import compile_trace
+
+Frame = Optional[list]
+Run = Callable[[Frame, Ctx], object]
+
+# Marca o retorno de nil, já que None indica que nenhum return foi executado.
+NIL = object()
+
+# Valor dos slots cujas declarações ainda não foram executadas. Apenas os
+# acessos a declarações posteriores (atributo `forward` de Var e Assign) podem
+# encontrá-lo; nesse caso, a busca continua nos escopos externos.
+UNSET = object()
+
+_MISSING = object()
+
+# Operadores que sempre produzem um bool do Python. Em condições formadas por
+# eles, a veracidade do Lox coincide com a do Python e podemos testar o valor
+# diretamente, sem comparar com nil e false.
+BOOL_BINOPS = {eq, ne, lt, le, gt, ge}
+
+# Implementações dos operadores para dois números. Quando os dois operandos são
+# floats, chamamos a função do módulo operator diretamente e só delegamos para
+# o operador do Lox, com suas verificações de tipo, nos demais casos. A divisão
+# fica de fora por causa do tratamento especial da divisão por zero.
+FLOAT_BINOPS = {
+    add: operator.add,
+    sub: operator.sub,
+    mul: operator.mul,
+    lt: operator.lt,
+    le: operator.le,
+    gt: operator.gt,
+    ge: operator.ge,
+    eq: operator.eq,
+    ne: operator.ne,
+}
+
+
+def compile_program(program: Program) -> Callable[[Ctx], None]:
+    """
+    Compila um programa e retorna uma função que o executa em um contexto.
+    """
+    resolve(program)
+    stmts = compile_stmts(program.stmts)
+
+    def run(ctx: Ctx) -> None:
+        # Não há return no nível superior do programa
+        for stmt in stmts:
+            stmt(None, ctx)
+
+    return run
+
+
+def compile_stmts(stmts: list[Stmt]) -> tuple[Run, ...]:
+    """
+    Compila uma sequência de comandos.
+    """
+    return tuple(compile_stmt(stmt) for stmt in stmts)
+
+
+def compile_stmt(node: Node) -> Run:
+    """
+    Compila um nó em posição de comando.
+
+    Expressões podem aparecer como comandos (ex.: o inicializador de um for
+    convertido para while). Neste caso, o valor é descartado para não ser
+    confundido com o valor de um return.
+    """
+    run = compile_node(node)
+    if not isinstance(node, Expr):
+        return run
+
+    def stmt(f, ctx):
+        run(f, ctx)
+
+    return stmt
+
+
+@singledispatch
+def compile_node(node: Node) -> Run:
+    """
+    Compila um nó da árvore sintática já resolvido.
+    """
+    name = type(node).__name__
+    raise TypeError(f"Não sei compilar nós do tipo {name}!")
+
+
+# FUNÇÕES AUXILIARES
+
+
+def lookup(ctx: Ctx, name: str):
+    """
+    Busca um nome no contexto, levantando NameError se ele não existir.
+    """
+    value = ctx.get(name, _MISSING)
+    if value is _MISSING:
+        raise NameError(f"variável {name} não existe!")
+    return value
+
+
+def call(func, args: list):
+    """
+    Chama uma função Lox ou qualquer objeto chamável do Python.
+    """
+    if type(func) is LoxFunction:
+        return func.call(args)
+    if callable(func):
+        return func(*args)
+    raise TypeError(f"'{func}' não é uma função!")
+
+
+def get_attribute(value, name: str):
+    """
+    Lê o atributo de um objeto, como em `obj.name`.
+    """
+    # Campos de instâncias Lox são lidos diretamente, sem passar pelo
+    # protocolo de atributos do Python, que só chegaria a __getattr__
+    # depois de falhar a busca normal.
+    if type(value) is LoxInstance:
+        return value.get_field(name)
+    if isinstance(value, LoxClass):
+        try:
+            return value.get_method(name)
+        except Exception:
+            raise AttributeError(f"O objeto {value} não possui o atributo '{name}'")
+    try:
+        return getattr(value, name)
+    except AttributeError:
+        raise AttributeError(f"O objeto {value} não possui o atributo '{name}'")
+
+
+def is_bool_expr(node: Node) -> bool:
+    """
+    Verifica se a expressão sempre produz um bool.
+    """
+    match node:
+        case BinOp(op=op):
+            return op in BOOL_BINOPS
+        case UnaryOp(op=op):
+            return op is not_
+        case Literal(value=value):
+            return isinstance(value, bool)
+    return False
+
+
+def is_empty_block(node: Node) -> bool:
+    """
+    Verifica se o nó é um bloco vazio, como o else implícito dos comandos if.
+    """
+    return isinstance(node, Block) and not node.stmts
+
+
+def captures_frame(node: Node) -> bool:
+    """
+    Verifica se alguma função ou classe definida dentro do nó pode capturar
+    o frame em que ela foi criada.
+    """
+    return any(isinstance(child, (Function, Class)) for child in node.descendants())
+
+
+def compile_load(name: str, depth: Optional[int], slot: Optional[int]) -> Run:
+    """
+    Compila a leitura de uma variável.
+    """
+    if slot is None:
+        def run(f, ctx):
+            value = ctx.get(name, _MISSING)
+            if value is _MISSING:
+                raise NameError(f"variável {name} não existe!")
+            return value
+
+        return run
+
+    if depth == 0:
+        def run(f, ctx):
+            return f[slot]
+    elif depth == 1:
+        def run(f, ctx):
+            return f[0][slot]
+    elif depth == 2:
+        def run(f, ctx):
+            return f[0][0][slot]
+    else:
+        def run(f, ctx):
+            for _ in range(depth):
+                f = f[0]
+            return f[slot]
+    return run
+
+
+def compile_define(name: str, slot: Optional[int]) -> Callable[[Frame, Ctx, object], None]:
+    """
+    Compila a definição de um nome no escopo corrente.
+    """
+    if slot is None:
+        def define(f, ctx, value):
+            ctx.var_def(name, value)
+
+        return define
+
+    def define(f, ctx, value):
+        f[slot] = value
+
+    return define
+
+
+# EXPRESSÕES
+
+
+@compile_node.register
+def _(node: Literal):
+    value = node.value
+
+    def run(f, ctx):
+        return value
+
+    return run
+
+
+@compile_node.register
+def _(node: Var):
+    load = compile_load(node.name, node.depth, node.slot)
+    if not node.forward:
+        return load
+
+    forward = node.forward
+
+    def run(f, ctx):
+        for depth, slot in forward:
+            frame = f
+            for _ in range(depth):
+                frame = frame[0]
+            value = frame[slot]
+            if value is not UNSET:
+                return value
+        return load(f, ctx)
+
+    return run
+
+
+@compile_node.register
+def _(node: BinOp):
+    op = node.op
+    fast = FLOAT_BINOPS.get(op)
+    left = compile_node(node.left)
+
+    if isinstance(node.right, Literal):
+        value = node.right.value
+
+        if fast is not None and type(value) is float:
+            def run(f, ctx):
+                a = left(f, ctx)
+                if type(a) is float:
+                    return fast(a, value)
+                return op(a, value)
+
+            return run
+
+        def run(f, ctx):
+            return op(left(f, ctx), value)
+
+        return run
+
+    right = compile_node(node.right)
+
+    if fast is not None:
+        def run(f, ctx):
+            a = left(f, ctx)
+            b = right(f, ctx)
+            if type(a) is float and type(b) is float:
+                return fast(a, b)
+            return op(a, b)
+
+        return run
+
+    def run(f, ctx):
+        return op(left(f, ctx), right(f, ctx))
+
+    return run
+
+
+@compile_node.register
+def _(node: UnaryOp):
+    op = node.op
+    operand = compile_node(node.operand)
+
+    def run(f, ctx):
+        return op(operand(f, ctx))
+
+    return run
+
+
+@compile_node.register
+def _(node: And):
+    left = compile_node(node.left)
+    right = compile_node(node.right)
+
+    def run(f, ctx):
+        value = left(f, ctx)
+        if value is False or value is None:
+            return value
+        return right(f, ctx)
+
+    return run
+
+
+@compile_node.register
+def _(node: Or):
+    left = compile_node(node.left)
+    right = compile_node(node.right)
+
+    def run(f, ctx):
+        value = left(f, ctx)
+        if value is not False and value is not None:
+            return value
+        return right(f, ctx)
+
+    return run
+
+
+@compile_node.register
+def _(node: Call):
+    # O método init chamado explicitamente retorna a instância e por isso
+    # continua passando pelo Getattr, que cria um LoxInitFunction.
+    if isinstance(node.callee, Getattr) and node.callee.name != "init":
+        return compile_invoke(node)
+
+    callee = compile_node(node.callee)
+    params = tuple(compile_node(param) for param in node.params)
+
+    def run(f, ctx):
+        func = callee(f, ctx)
+        args = [param(f, ctx) for param in params]
+        return call(func, args)
+
+    return run
+
+
+def compile_invoke(node: Call) -> Run:
+    """
+    Compila a chamada de método `obj.name(args)`.
+
+    Quando `obj` é uma instância Lox e `name` é um método da sua classe, o
+    método é executado diretamente com this=obj, sem criar a função ligada
+    que o Getattr produziria para ser descartada logo em seguida.
+    """
+    assert isinstance(node.callee, Getattr)
+    name = node.callee.name
+    obj = compile_node(node.callee.obj)
+    params = tuple(compile_node(param) for param in node.params)
+
+    # Como em Call.eval, o método é obtido antes de avaliar os argumentos:
+    # erros de atributo acontecem antes dos efeitos colaterais dos argumentos
+    # e um argumento que modifica `obj.name` não muda o método chamado.
+    def run(f, ctx):
+        target = obj(f, ctx)
+        if type(target) is LoxInstance and name not in target.fields:
+            method = target.klass.find_method(name)
+            if method is not None:
+                return method.call([param(f, ctx) for param in params], this=target)
+        func = get_attribute(target, name)
+        return call(func, [param(f, ctx) for param in params])
+
+    return run
+
+
+@compile_node.register
+def _(node: This):
+    def run(f, ctx):
+        return lookup(ctx, "this")
+
+    return run
+
+
+@compile_node.register
+def _(node: Super):
+    name = node.name
+
+    def run(f, ctx):
+        instance = lookup(ctx, "this")
+        superclass = lookup(ctx, "super")
+        return superclass.get_method(name).bind(instance)
+
+    return run
+
+
+@compile_node.register
+def _(node: Assign):
+    name = node.name
+    value = compile_node(node.value)
+    depth, slot = node.depth, node.slot
+
+    if node.forward:
+        return compile_forward_assign(node, value)
+
+    if slot is None:
+        def run(f, ctx):
+            result = value(f, ctx)
+            ctx.assign(name, result)
+            return result
+
+        return run
+
+    # Assim como em compile_load, as profundidades mais comuns são
+    # especializadas. Closures costumam modificar variáveis do frame pai.
+    if depth == 0:
+        def run(f, ctx):
+            f[slot] = result = value(f, ctx)
+            return result
+    elif depth == 1:
+        def run(f, ctx):
+            f[0][slot] = result = value(f, ctx)
+            return result
+    elif depth == 2:
+        def run(f, ctx):
+            f[0][0][slot] = result = value(f, ctx)
+            return result
+    else:
+        def run(f, ctx):
+            result = value(f, ctx)
+            frame = f
+            for _ in range(depth):
+                frame = frame[0]
+            frame[slot] = result
+            return result
+    return run
+
+
+def compile_store(
+    name: str, depth: Optional[int], slot: Optional[int]
+) -> Callable[[Frame, Ctx, object], None]:
+    """
+    Compila a escrita de uma variável já declarada.
+    """
+    if slot is None:
+        def store(f, ctx, value):
+            ctx.assign(name, value)
+
+        return store
+
+    def store(f, ctx, value):
+        for _ in range(depth):
+            f = f[0]
+        f[slot] = value
+
+    return store
+
+
+def compile_forward_assign(node: Assign, value: Run) -> Run:
+    """
+    Compila uma atribuição a uma variável que talvez seja declarada depois.
+
+    A primeira declaração posterior que já tiver sido executada recebe o
+    valor; se nenhuma tiver, atribuímos à variável do endereço normal.
+    """
+    forward = node.forward
+    store = compile_store(node.name, node.depth, node.slot)
+
+    def run(f, ctx):
+        result = value(f, ctx)
+        for depth, slot in forward:
+            frame = f
+            for _ in range(depth):
+                frame = frame[0]
+            if frame[slot] is not UNSET:
+                frame[slot] = result
+                return result
+        store(f, ctx, result)
+        return result
+
+    return run
+
+
+@compile_node.register
+def _(node: Getattr):
+    name = node.name
+    obj = compile_node(node.obj)
+
+    def run(f, ctx):
+        return get_attribute(obj(f, ctx), name)
+
+    return run
+
+
+@compile_node.register
+def _(node: Setattr):
+    name = node.name
+    obj = compile_node(node.obj)
+    value = compile_node(node.value)
+
+    def run(f, ctx):
+        target = obj(f, ctx)
+        result = value(f, ctx)
+        if type(target) is LoxInstance:
+            target.fields[name] = result
+        elif isinstance(target, (LoxClass, LoxFunction)):
+            raise LoxError("Apenas instâncias podem ter campos.")
+        elif isinstance(target, LoxInstance):
+            target.set_field(name, result)
+        else:
+            setattr(target, name, result)
+        return result
+
+    return run
+
+
+# COMANDOS
+
+
+@compile_node.register
+def _(node: ExprStmt):
+    expr = compile_node(node.expr)
+
+    def run(f, ctx):
+        expr(f, ctx)
+
+    return run
+
+
+@compile_node.register
+def _(node: Print):
+    expr = compile_node(node.expr)
+
+    def run(f, ctx):
+        lox_print(expr(f, ctx))
+
+    return run
+
+
+@compile_node.register
+def _(node: Return):
+    if node.value is None:
+        def run(f, ctx):
+            return NIL
+
+        return run
+
+    value = compile_node(node.value)
+
+    def run(f, ctx):
+        result = value(f, ctx)
+        return NIL if result is None else result
+
+    return run
+
+
+@compile_node.register
+def _(node: VarDef):
+    initializer = compile_node(node.initializer)
+    define = compile_define(node.name, node.slot)
+
+    def run(f, ctx):
+        define(f, ctx, initializer(f, ctx))
+
+    return run
+
+
+@compile_node.register
+def _(node: If):
+    condition = compile_node(node.condition)
+    then_branch = compile_stmt(node.then_branch)
+
+    if is_empty_block(node.else_branch) and is_bool_expr(node.condition):
+        def run(f, ctx):
+            if condition(f, ctx):
+                return then_branch(f, ctx)
+
+        return run
+
+    if is_empty_block(node.else_branch):
+        def run(f, ctx):
+            value = condition(f, ctx)
+            if value is not False and value is not None:
+                return then_branch(f, ctx)
+
+        return run
+
+    else_branch = compile_stmt(node.else_branch)
+
+    if is_bool_expr(node.condition):
+        def run(f, ctx):
+            if condition(f, ctx):
+                return then_branch(f, ctx)
+            return else_branch(f, ctx)
+
+        return run
+
+    def run(f, ctx):
+        value = condition(f, ctx)
+        if value is not False and value is not None:
+            return then_branch(f, ctx)
+        return else_branch(f, ctx)
+
+    return run
+
+
+@compile_node.register
+def _(node: While):
+    loop = compile_loop(node)
+    trace = compile_trace(node)
+    if trace is None:
+        return loop
+
+    # Laços numéricos executam o trace especializado sempre que as variáveis
+    # envolvidas são floats e o laço compilado normalmente nos demais casos.
+    # Traces não possuem return, então o resultado é sempre None.
+    def run(f, ctx):
+        if not trace(f, ctx):
+            return loop(f, ctx)
+
+    return run
+
+
+def compile_loop(node: While) -> Run:
+    """
+    Compila um laço while.
+    """
+    condition = compile_node(node.condition)
+    owned = loop_frame_block(node.body)
+    if owned is None:
+        body = compile_stmt(node.body)
+    else:
+        body = compile_owned_body(node.body, owned)
+
+    if is_bool_expr(node.condition):
+        if owned is None:
+            def run(f, ctx):
+                while condition(f, ctx):
+                    result = body(f, ctx)
+                    if result is not None:
+                        return result
+
+            return run
+
+        slots = (UNSET,) * owned.n_slots
+
+        def run(f, ctx):
+            frame = [f, *slots]
+            while condition(f, ctx):
+                result = body(frame, ctx)
+                if result is not None:
+                    return result
+
+        return run
+
+    if owned is None:
+        def run(f, ctx):
+            while True:
+                value = condition(f, ctx)
+                if value is False or value is None:
+                    break
+                result = body(f, ctx)
+                if result is not None:
+                    return result
+
+        return run
+
+    slots = (UNSET,) * owned.n_slots
+
+    def run(f, ctx):
+        frame = [f, *slots]
+        while True:
+            value = condition(f, ctx)
+            if value is False or value is None:
+                break
+            result = body(frame, ctx)
+            if result is not None:
+                return result
+
+    return run
+
+
+def loop_frame_block(body: Node) -> Optional[Block]:
+    """
+    Retorna o bloco cujo frame pode ser criado uma única vez por execução do
+    laço, em vez de uma vez por iteração, ou None se não houver um.
+
+    Esse bloco é o próprio corpo do laço ou, como nos laços for, o único bloco
+    com variáveis dentro de um corpo que não declara nomes.
+
+    Reaproveitar o frame entre as iterações é seguro quando nenhuma função ou
+    classe definida no bloco pode capturá-lo. Os valores da iteração anterior
+    não são observáveis, já que o resolvedor garante que uma variável local só
+    é lida depois que sua declaração a inicializou. O frame pertence à
+    execução do laço: chamadas recursivas executam o laço com outro frame e,
+    quando o laço termina, o frame e os valores que ele guarda são liberados.
+    """
+    if not isinstance(body, Block):
+        return None
+    if body.n_slots == 0:
+        blocks = [stmt for stmt in body.stmts if isinstance(stmt, Block) and stmt.n_slots]
+        if len(blocks) != 1:
+            return None
+        block = blocks[0]
+    else:
+        block = body
+    return None if captures_frame(block) else block
+
+
+def compile_owned_body(body: Block, owned: Block) -> Run:
+    """
+    Compila o corpo de um laço que recebe o frame do bloco `owned` já criado.
+
+    Os comandos do bloco `owned` executam com esse frame e os demais comandos
+    do corpo, com o frame pai, guardado no slot 0.
+    """
+    if body is owned:
+        steps = [(stmt, True) for stmt in compile_stmts(owned.stmts)]
+    else:
+        steps = []
+        for stmt in body.stmts:
+            if stmt is owned:
+                steps.extend((inner, True) for inner in compile_stmts(owned.stmts))
+            else:
+                steps.append((compile_stmt(stmt), False))
+    steps = tuple(steps)
+
+    def run(frame, ctx):
+        for stmt, own in steps:
+            result = stmt(frame if own else frame[0], ctx)
+            if result is not None:
+                return result
+
+    return run
+
+
+@compile_node.register
+def _(node: Block):
+    stmts = compile_stmts(node.stmts)
+
+    # Blocos que não declaram nomes não precisam de um frame próprio.
+    if node.n_slots == 0:
+        def run(f, ctx):
+            for stmt in stmts:
+                result = stmt(f, ctx)
+                if result is not None:
+                    return result
+
+        return run
+
+    slots = (UNSET,) * node.n_slots
+
+    def run(f, ctx):
+        frame = [f, *slots]
+        for stmt in stmts:
+            result = stmt(frame, ctx)
+            if result is not None:
+                return result
+
+    return run
+
+
+def compile_function(node: Function):
+    """
+    Compila o corpo de uma função ou método.
+
+    Retorna uma função `code(f, ctx, args)` que cria o frame da chamada com os
+    argumentos e executa o corpo. Os parâmetros e as declarações no nível
+    superior do corpo compartilham o mesmo frame.
+    """
+    stmts = compile_stmts(node.body.stmts)
+    slots = (UNSET,) * (node.n_slots - len(node.params))
+
+    def code(f, ctx, args):
+        frame = [f, *args, *slots]
+        for stmt in stmts:
+            result = stmt(frame, ctx)
+            if result is not None:
+                return None if result is NIL else result
+        return None
+
+    return code
+
+
+@compile_node.register
+def _(node: Function):
+    name = node.name
+    params = node._param_names
+    body = node.body
+
+    define = compile_define(name, node.slot)
+    code = compile_function(node)
+
+    def run(f, ctx):
+        function = LoxFunction(name, params, body, ctx, code=code, frame=f)
+        define(f, ctx, function)
+
+    return run
+
+
+@compile_node.register
+def _(node: Class):
+    name = node.name
+    base = compile_node(node.base) if node.base is not None else None
+    base_name = node.base.name if node.base is not None else None
+    define = compile_define(name, node.slot)
+    methods = [
+        (method.name, method._param_names, method.body, compile_function(method))
+        for method in node.methods
+    ]
+
+    def run(f, ctx):
+        # Carrega a superclasse, caso exista
+        superclass = None
+        if base is not None:
+            superclass = base(f, ctx)
+            if not isinstance(superclass, LoxClass):
+                raise LoxError(f"'{base_name}' não é uma classe")
+
+        method_ctx = ctx if superclass is None else ctx.push({"super": superclass})
+        impls = {
+            method_name: LoxFunction(method_name, params, body, method_ctx, code=code, frame=f)
+            for method_name, params, body, code in methods
+        }
+        lox_class = LoxClass(name, impls, superclass)
+        define(f, ctx, lox_class)
+
+    return run
+
+
+__all__ = ["compile_program", "compile_node"]
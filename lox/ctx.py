@@ -1,7 +1,7 @@
 import math
 import time
 from dataclasses import field
-from typing import TYPE_CHECKING, Iterator, Optional, TypeVar
+from typing import TYPE_CHECKING, Any, Iterator, Optional, TypeVar
 
 from lox.ast import dataclass
 
@@ -59,6 +59,19 @@ class Ctx:
             return self.parent[name]
         raise KeyError(f"Variable '{name}' not found in context.")
 
+    def get(self, name: str, default: Any = None) -> "Value":
+        """
+        Obtém o valor de uma variável pelo nome ou retorna `default` se ela
+        não existir, como dict.get().
+        """
+        ctx: Optional[Ctx] = self
+        while ctx is not None:
+            scope = ctx.scope
+            if name in scope:
+                return scope[name]
+            ctx = ctx.parent
+        return default
+
     def __setitem__(self, name: str, value: "Value") -> None:
         """
         Define o valor de uma variável pelo nome.
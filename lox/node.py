@@ -318,6 +318,12 @@ class Cursor(Generic[N]):
 
     node: N
     parent_cursor: Optional["Cursor[Node]"] = field(default=None, repr=False)
+    # Memoriza o escopo envolvente de cada tipo (veja `enclosing`). Cursores
+    # irmãos compartilham os mesmos cursores pais, então cada ancestral é
+    # examinado no máximo uma vez por tipo de escopo.
+    _enclosing: Optional[dict[type, Optional["Cursor[Node]"]]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def parent(self) -> "Cursor[Node]":
         """
@@ -406,6 +412,34 @@ class Cursor(Generic[N]):
             for child in self.children():
                 yield from child.descendants(skip)
 
+    def enclosing(self, scope: type[Node]) -> Optional["Cursor[Node]"]:
+        """
+        Retorna um cursor para o pai mais próximo do tipo dado ou None, caso
+        o nó atual não esteja dentro de um escopo deste tipo.
+        """
+        # Sobe até encontrar um cursor com a resposta memorizada ou o próprio
+        # escopo e então preenche o cache dos cursores visitados no caminho.
+        visited = []
+        cursor: Optional[Cursor[Node]] = cast("Cursor[Node]", self)
+        result = None
+        while cursor is not None:
+            cache = cursor._enclosing
+            if cache is not None and scope in cache:
+                result = cache[scope]
+                break
+            visited.append(cursor)
+            parent = cursor.parent_cursor
+            if parent is not None and isinstance(parent.node, scope):
+                result = parent
+                break
+            cursor = parent
+
+        for cursor in visited:
+            if cursor._enclosing is None:
+                cursor._enclosing = {}
+            cursor._enclosing[scope] = result
+        return result
+
     def is_scoped_to(self, scope: type[Node]) -> bool:
         """
         Verifica se o nó atual está definido dentro de um escopo específico.
@@ -414,10 +448,7 @@ class Cursor(Generic[N]):
         escopo específico. Isso é útil para verificar se o nó atual
         está dentro de uma classe ou função.
         """
-        for parent in self.parents():
-            if isinstance(parent.node, scope):
-                return True
-        return False
+        return self.enclosing(scope) is not None
 
     def class_scope(self) -> "Cursor[Class]":
         """
@@ -425,10 +456,10 @@ class Cursor(Generic[N]):
         """
         from .ast import Class
 
-        for parent in self.parents():
-            if isinstance(parent.node, Class):
-                return parent
-        raise ValueError("O cursor não está dentro de uma classe")
+        cursor = self.enclosing(Class)
+        if cursor is None:
+            raise ValueError("O cursor não está dentro de uma classe")
+        return cast("Cursor[Class]", cursor)
 
     def function_scope(self, root=False) -> "Cursor[Function]":
         """
@@ -441,12 +472,16 @@ class Cursor(Generic[N]):
         """
         from .ast import Function
 
+        if not root:
+            cursor = self.enclosing(Function)
+            if cursor is None:
+                raise ValueError("O cursor não está dentro de uma função")
+            return cast("Cursor[Function]", cursor)
+
         cursor = None
         for parent in self.parents():
             if isinstance(parent.node, Function):
                 cursor = parent
-                if not root:
-                    return cursor
 
         if cursor is None:
             raise ValueError("O cursor não está dentro de uma função")
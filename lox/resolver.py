@@ -0,0 +1,247 @@
+"""
+Resolução estática de nomes.
+
+O resolvedor percorre o programa uma única vez, antes da execução, e associa
+cada variável local a um endereço (profundidade, slot):
+
+    profundidade:
+        Quantos frames devemos subir a partir do frame corrente.
+    slot:
+        Posição da variável dentro do frame. O slot 0 guarda o frame pai,
+        então as variáveis começam no slot 1.
+
+Os endereços são gravados nos próprios nós da árvore (atributos `depth` e
+`slot` de Var e Assign, `slot` de VarDef, Function e Class e `n_slots` de
+Block e Function). Nomes que não são encontrados em nenhum escopo local são
+globais e mantém `slot = None`; eles continuam sendo buscados por nome no
+contexto de execução, assim como `this` e `super`.
+
+Os corpos de funções e métodos só executam quando a função é chamada, depois
+que o escopo onde ela foi declarada pode ter ganhado novas variáveis:
+
+    {
+        fun f() { return a; }
+        var a = 1;
+        print f();  // 1
+    }
+
+Por isso, esses corpos são resolvidos apenas depois que todos os escopos
+envolventes estão completos. Nomes declarados depois da função ficam no
+atributo `forward` de Var e Assign: em tempo de execução, esses slots são
+consultados primeiro e ignorados enquanto a declaração ainda não tiver sido
+executada, caso em que a busca continua no endereço dado por `depth` e `slot`.
+"""
+
+from dataclasses import dataclass, field
+from functools import singledispatch
+from typing import Optional
+
+from .ast import Assign, Block, Class, Function, Program, Stmt, Var, VarDef
+from .node import Node
+
+
+@dataclass
+class Scope:
+    """
+    Escopo léxico em tempo de compilação.
+
+    Cada escopo corresponde a um frame em tempo de execução. O atributo
+    `parent_size` guarda o número de slots do escopo pai no momento em que
+    este escopo foi criado: apenas esses slots certamente estão inicializados
+    quando o código deste escopo executa. None indica que todos estão.
+
+    Em funções, os parâmetros ocupam os primeiros `n_params` slots. Como no
+    interpretador original, as declarações no nível superior do corpo podem
+    sombreá-los.
+    """
+
+    parent: Optional["Scope"] = None
+    names: dict[str, int] = field(default_factory=dict)
+    size: int = 1
+    parent_size: Optional[int] = None
+    n_params: int = 0
+
+    def declare(self, name: str) -> int:
+        """
+        Reserva um slot para a variável e retorna seu índice.
+
+        Levanta KeyError se o nome já foi declarado no escopo, como
+        Ctx.var_def.
+        """
+        if self.names.get(name, 0) > self.n_params:
+            raise KeyError(f"Variable '{name}' already defined in the current scope.")
+        slot = self.size
+        self.names[name] = slot
+        self.size += 1
+        return slot
+
+    def resolve(self, name: str) -> tuple[int, int] | None:
+        """
+        Retorna a dupla (profundidade, slot) da variável ou None se ela for
+        global.
+        """
+        return self.lookup(name)[1]
+
+    def lookup(self, name: str) -> tuple[list[tuple[int, int]], tuple[int, int] | None]:
+        """
+        Retorna os endereços de declarações posteriores ao escopo corrente,
+        que talvez ainda não tenham sido executadas, e o endereço da primeira
+        declaração que certamente já foi executada (ou None, se o nome for
+        global).
+        """
+        forward = []
+        scope: Optional[Scope] = self
+        depth = 0
+        limit = None
+        while scope is not None:
+            slot = scope.names.get(name)
+            if slot is not None:
+                if limit is None or slot < limit:
+                    return forward, (depth, slot)
+                forward.append((depth, slot))
+            limit = scope.parent_size
+            scope = scope.parent
+            depth += 1
+        return forward, None
+
+
+# Corpos de funções aguardando resolução: (função, escopo da declaração,
+# tamanho desse escopo no momento da declaração).
+Pending = list[tuple[Function, Optional[Scope], Optional[int]]]
+
+
+def resolve(program: Program) -> None:
+    """
+    Resolve os nomes de todas as variáveis locais do programa.
+    """
+    pending: Pending = []
+    resolve_stmts(program.stmts, None, pending)
+
+    # Um corpo só é resolvido depois que o escopo de quem o declarou está
+    # completo. Corpos aninhados entram na fila durante a resolução do corpo
+    # externo e, portanto, são resolvidos depois dele.
+    while pending:
+        resolve_function(*pending.pop(), pending)
+
+
+def resolve_stmts(stmts: list[Stmt], scope: Optional[Scope], pending: Pending) -> None:
+    """
+    Resolve uma sequência de comandos no escopo dado.
+    """
+    for stmt in stmts:
+        resolve_node(stmt, scope, pending)
+
+
+def declares_names(stmts: list[Stmt]) -> bool:
+    """
+    Verifica se algum comando da sequência declara um nome no escopo.
+    """
+    return any(isinstance(stmt, (VarDef, Function, Class)) for stmt in stmts)
+
+
+def declare(name: str, scope: Optional[Scope]) -> Optional[int]:
+    """
+    Declara um nome no escopo e retorna seu slot ou None se o escopo for global.
+
+    O slot é reservado no momento em que a declaração é visitada, então o
+    código executado antes da declaração não enxerga a nova variável.
+    """
+    if scope is None:
+        return None
+    return scope.declare(name)
+
+
+def resolve_name(node: Var | Assign, scope: Optional[Scope]) -> None:
+    """
+    Grava o endereço e as declarações posteriores de uma variável no nó.
+    """
+    forward, address = scope.lookup(node.name) if scope is not None else ([], None)
+    node.depth, node.slot = address or (None, None)
+    node.forward = tuple(forward)
+
+
+@singledispatch
+def resolve_node(node: Node, scope: Optional[Scope], pending: Pending) -> None:
+    """
+    Resolve os nomes de um nó da árvore sintática.
+
+    A implementação padrão simplesmente visita os filhos na ordem em que foram
+    declarados.
+    """
+    for child in node.children():
+        resolve_node(child, scope, pending)
+
+
+@resolve_node.register
+def _(node: Var, scope, pending):
+    resolve_name(node, scope)
+
+
+@resolve_node.register
+def _(node: Assign, scope, pending):
+    resolve_node(node.value, scope, pending)
+    resolve_name(node, scope)
+
+
+@resolve_node.register
+def _(node: VarDef, scope, pending):
+    # O inicializador é resolvido antes de declarar o nome: `var a = a;`
+    # num bloco se refere à variável `a` do escopo externo.
+    resolve_node(node.initializer, scope, pending)
+    node.slot = declare(node.name, scope)
+
+
+@resolve_node.register
+def _(node: Block, scope, pending):
+    # Blocos que não declaram nomes não precisam de um frame próprio.
+    if not declares_names(node.stmts):
+        node.n_slots = 0
+        resolve_stmts(node.stmts, scope, pending)
+        return
+
+    inner = Scope(scope, parent_size=scope.size if scope is not None else None)
+    resolve_stmts(node.stmts, inner, pending)
+    node.n_slots = inner.size - 1
+
+
+def defer_function(node: Function, scope: Optional[Scope], pending: Pending) -> None:
+    """
+    Agenda a resolução do corpo de uma função ou método.
+    """
+    pending.append((node, scope, scope.size if scope is not None else None))
+
+
+def resolve_function(
+    node: Function, scope: Optional[Scope], parent_size: Optional[int], pending: Pending
+) -> None:
+    """
+    Resolve o corpo de uma função ou método.
+
+    Os parâmetros e as declarações no nível superior do corpo compartilham o
+    mesmo frame.
+    """
+    inner = Scope(scope, parent_size=parent_size)
+    for param in node.params:
+        param.depth, param.slot = 0, inner.declare(param.name)
+    inner.n_params = len(node.params)
+    resolve_stmts(node.body.stmts, inner, pending)
+    node.n_slots = inner.size - 1
+
+
+@resolve_node.register
+def _(node: Function, scope, pending):
+    # O nome é declarado antes de agendar o corpo para permitir recursão.
+    node.slot = declare(node.name, scope)
+    defer_function(node, scope, pending)
+
+
+@resolve_node.register
+def _(node: Class, scope, pending):
+    if node.base is not None:
+        resolve_node(node.base, scope, pending)
+    node.slot = declare(node.name, scope)
+    for method in node.methods:
+        defer_function(method, scope, pending)
+
+
+__all__ = ["resolve", "resolve_node", "Scope"]
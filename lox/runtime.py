@@ -1,8 +1,8 @@
-import builtins
+import sys
 import uuid
 from dataclasses import dataclass, field
 from types import BuiltinFunctionType, FunctionType
-from typing import TYPE_CHECKING, Any, Optional
+from typing import TYPE_CHECKING, Any, Callable, Optional
 
 from .ctx import Ctx
 
@@ -24,6 +24,12 @@ class LoxClass:
     name: str
     methods: dict[str, "LoxFunction"]
     base: Optional["LoxClass"] = None
+    # Memoriza o resultado de find_method(), inclusive as buscas sem sucesso.
+    # Os dicionários de métodos não mudam depois que a classe é criada, então
+    # o cache nunca precisa ser invalidado.
+    _method_cache: dict[str, Optional["LoxFunction"]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
 
     def __call__(self, *args):
         """
@@ -34,67 +40,88 @@ class LoxClass:
         instance = LoxInstance(self)
         
         # Se houver um método init, chame-o com os argumentos fornecidos
-        try:
-            initializer = self.get_method("init")
-            bound_initializer = initializer.bind(instance)
-            bound_initializer(*args)
-        except LoxError:
-            if len(args) > 0:
-                raise TypeError(f"Esperava 0 argumentos mas recebeu {len(args)}")
+        initializer = self.find_method("init")
+        if initializer is not None:
+            initializer.call(list(args), this=instance)
+        elif len(args) > 0:
+            raise TypeError(f"Esperava 0 argumentos mas recebeu {len(args)}")
             
         return instance
 
+    def find_method(self, name: str) -> Optional["LoxFunction"]:
+        """
+        Procura o método na classe atual ou em suas bases.
+        Retorna None se não encontrar.
+        """
+        cache = self._method_cache
+        if name in cache:
+            return cache[name]
+
+        # Procura na classe atual e, em seguida, na classe base
+        if name in self.methods:
+            method = self.methods[name]
+        elif self.base is not None:
+            method = self.base.find_method(name)
+        else:
+            method = None
+
+        cache[name] = method
+        return method
+
     def get_method(self, name: str) -> "LoxFunction":
         """
         Procura o método na classe atual ou em suas bases.
         Levanta LoxError se não encontrar.
         """
-        # Procura na classe atual
-        if name in self.methods:
-            return self.methods[name]
-        
-        # Se não encontrou e tiver uma classe base, procura nela
-        if self.base is not None:
-            return self.base.get_method(name)
-        
-        # Se não encontrou em lugar nenhum, levanta exceção
-        raise LoxError(f"Método '{name}' não encontrado na classe '{self.name}'")
+        method = self.find_method(name)
+        if method is None:
+            raise LoxError(f"Método '{name}' não encontrado na classe '{self.name}'")
+        return method
 
     def __str__(self) -> str:
         return self.name
 
-@dataclass
+@dataclass(slots=True)
 class LoxInstance:
-    """Representa uma instância de uma classe Lox."""
+    """
+    Representa uma instância de uma classe Lox.
+
+    Usa __slots__ para que cada instância guarde apenas a classe e o dicionário
+    de campos, sem o __dict__ de atributos Python.
+    """
     klass: LoxClass
     fields: dict[str, Any] = field(default_factory=dict)
 
     def __getattr__(self, name: str):
         """Implementa a busca de atributos em instâncias Lox."""
-        if name in self.fields:
-            return self.fields[name]
-        
-        try:
-            method = self.klass.get_method(name)
-            # Para o método init, usar comportamento especial
-            if name == "init":
-                bound_method = method.bind(self)
-                return LoxInitFunction(
-                    bound_method.name,
-                    bound_method.params,
-                    bound_method.body,
-                    bound_method.ctx,
-                    self
-                )
-            else:
-                # Associa o método à instância atual
-                return method.bind(self)
-        except LoxError:
-            raise LoxError(f"Campo '{name}' não existe")
+        return self.get_field(name)
 
     def get_field(self, name: str):
-        """Retorna o valor de um campo da instância."""
-        return self.__getattr__(name)
+        """
+        Retorna o valor de um campo da instância.
+
+        Campos têm precedência sobre métodos, que são associados à instância.
+        """
+        fields = self.fields
+        if name in fields:
+            return fields[name]
+
+        method = self.klass.find_method(name)
+        if method is None:
+            raise LoxError(f"Campo '{name}' não existe")
+        bound_method = method.bind(self)
+        # Para o método init, usar comportamento especial
+        if name == "init":
+            return LoxInitFunction(
+                bound_method.name,
+                bound_method.params,
+                bound_method.body,
+                bound_method.ctx,
+                self,
+                code=bound_method.code,
+                frame=bound_method.frame,
+            )
+        return bound_method
 
     def set_field(self, name: str, value):
         """Define o valor de um campo da instância."""
@@ -108,10 +135,18 @@ class LoxInstance:
 class LoxFunction:
     """Representa uma função Lox em tempo de execução."""
     name: str
-    params: list[str]
+    params: tuple[str, ...]
     body: "Block"
     ctx: Ctx
     _id: str = field(default_factory=lambda: str(uuid.uuid4()), init=False)
+    # Corpo compilado pelo lox.compiler e frame local capturado na definição.
+    # Funções criadas pelo método eval da AST não possuem código compilado.
+    code: Optional[Callable] = field(default=None, kw_only=True, repr=False, compare=False)
+    frame: Optional[list] = field(default=None, kw_only=True, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Normaliza os parâmetros uma única vez, na criação da função.
+        self.params = tuple(self.params)
 
     def __str__(self) -> str:
         if self.name:
@@ -125,23 +160,28 @@ class LoxFunction:
             self.name,
             self.params,
             self.body,
-            self.ctx.push({"this": obj})
+            self.ctx.push({"this": obj}),
+            code=self.code,
+            frame=self.frame,
         )
 
-    def call(self, args: list["Value"]):
-        # Converte os parâmetros para strings se forem objetos Var
-        param_names = []
-        for param in self.params:
-            if hasattr(param, 'name'):
-                param_names.append(param.name)
-            else:
-                param_names.append(str(param))
-                
-        if len(args) != len(param_names):
-            raise TypeError(f"'{self.name}' esperava {len(param_names)} argumentos, mas recebeu {len(args)}.")
-
-        local_env = dict(zip(param_names, args))
-        call_ctx = self.ctx.push(local_env)
+    def call(self, args: list["Value"], this: Optional["LoxInstance"] = None):
+        """
+        Executa a função com os argumentos dados.
+
+        Se `this` for fornecido, a função é executada como um método dessa
+        instância, sem precisar criar uma nova função com bind().
+        """
+        params = self.params
+        if len(args) != len(params):
+            raise TypeError(f"'{self.name}' esperava {len(params)} argumentos, mas recebeu {len(args)}.")
+
+        ctx = self.ctx if this is None else self.ctx.push({"this": this})
+        if self.code is not None:
+            return self.code(self.frame, ctx, args)
+
+        local_env = dict(zip(params, args))
+        call_ctx = ctx.push(local_env)
 
         try:
             self.body.eval(call_ctx)
@@ -173,9 +213,16 @@ def show(value: "Value") -> str:
         return "true"
     if value is False:
         return "false"
-    if isinstance(value, float):
+    # Números e strings são os casos mais comuns: testamos o tipo exato antes
+    # de recorrer às verificações com isinstance().
+    kind = type(value)
+    if kind is float:
         # Dica: str(42.0) -> "42.0", removesuffix -> "42"
         return str(value).removesuffix('.0')
+    if kind is str:
+        return value
+    if isinstance(value, float):
+        return str(value).removesuffix('.0')
     if isinstance(value, (BuiltinFunctionType, FunctionType)):
         return "<native fn>"
     # Para LoxFunction, LoxClass, LoxInstance e str, o __str__ já faz o trabalho.
@@ -183,7 +230,9 @@ def show(value: "Value") -> str:
 
 def print(value: "Value"):
     """Imprime um valor Lox usando a representação correta."""
-    builtins.print(show(value))
+    # Uma única escrita em sys.stdout custa metade de builtins.print(), que
+    # escreve o valor e a quebra de linha separadamente.
+    sys.stdout.write(show(value) + "\n")
 
 def truthy(value: "Value") -> bool:
     """
@@ -200,7 +249,7 @@ def not_(value: "Value") -> bool:
 
 def neg(value: "Value") -> float:
     """Operador de negação aritmética Lox (-)."""
-    if not isinstance(value, float):
+    if type(value) is not float and not isinstance(value, float):
         raise LoxError("Operand must be a number.")
     return -value
 
@@ -215,33 +264,35 @@ def ne(a: "Value", b: "Value") -> bool:
     """Operador de desigualdade Lox (!=)."""
     return not eq(a, b)
 
-def _check_numbers(*operands):
-    """Função auxiliar para garantir que todos os operandos são números."""
-    for op in operands:
-        if not isinstance(op, float):
-            raise LoxError("Operands must be numbers.")
-
 def add(a: "Value", b: "Value") -> "Value":
     """Operador de adição Lox (+)."""
-    if isinstance(a, float) and isinstance(b, float):
+    if type(a) is float and type(b) is float or isinstance(a, float) and isinstance(b, float):
         return a + b
-    if isinstance(a, str) and isinstance(b, str):
+    if type(a) is str and type(b) is str or isinstance(a, str) and isinstance(b, str):
         return a + b
     raise LoxError("Operands must be two numbers or two strings.")
 
+# Os operadores numéricos verificam os tipos diretamente, sem chamar uma função
+# auxiliar, já que são executados em toda operação binária. A comparação com
+# type() é mais rápida que isinstance() e cobre os valores criados pelo Lox;
+# isinstance() fica como alternativa para subclasses de float vindas do Python.
+
 def sub(a: float, b: float) -> float:
     """Operador de subtração Lox (-)."""
-    _check_numbers(a, b)
-    return a - b
+    if type(a) is float and type(b) is float or isinstance(a, float) and isinstance(b, float):
+        return a - b
+    raise LoxError("Operands must be numbers.")
 
 def mul(a: float, b: float) -> float:
     """Operador de multiplicação Lox (*)."""
-    _check_numbers(a, b)
-    return a * b
+    if type(a) is float and type(b) is float or isinstance(a, float) and isinstance(b, float):
+        return a * b
+    raise LoxError("Operands must be numbers.")
 
 def truediv(a: float, b: float) -> float:
     """Operador de divisão Lox (/)."""
-    _check_numbers(a, b)
+    if not (type(a) is float and type(b) is float or isinstance(a, float) and isinstance(b, float)):
+        raise LoxError("Operands must be numbers.")
     if b == 0:
         if a == 0:
             # 0/0 deve retornar NaN
@@ -254,23 +305,27 @@ def truediv(a: float, b: float) -> float:
 
 def lt(a: float, b: float) -> bool:
     """Operador 'menor que' Lox (<)."""
-    _check_numbers(a, b)
-    return a < b
+    if type(a) is float and type(b) is float or isinstance(a, float) and isinstance(b, float):
+        return a < b
+    raise LoxError("Operands must be numbers.")
 
 def le(a: float, b: float) -> bool:
     """Operador 'menor ou igual' Lox (<=)."""
-    _check_numbers(a, b)
-    return a <= b       
+    if type(a) is float and type(b) is float or isinstance(a, float) and isinstance(b, float):
+        return a <= b
+    raise LoxError("Operands must be numbers.")
 
 def gt(a: float, b: float) -> bool:
     """Operador 'maior que' Lox (>)."""
-    _check_numbers(a, b)
-    return a > b
+    if type(a) is float and type(b) is float or isinstance(a, float) and isinstance(b, float):
+        return a > b
+    raise LoxError("Operands must be numbers.")
 
 def ge(a: float, b: float) -> bool:
     """Operador 'maior ou igual' Lox (>=)."""
-    _check_numbers(a, b)
-    return a >= b
+    if type(a) is float and type(b) is float or isinstance(a, float) and isinstance(b, float):
+        return a >= b
+    raise LoxError("Operands must be numbers.")
 
 # Lista de nomes a serem exportados para o transformer
 __all__ = [
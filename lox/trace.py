@@ -0,0 +1,228 @@
+"""
+Especialização de laços numéricos.
+
+Laços como `while (i < n) { s = s + i * i; i = i + 1; }` passam a maior parte
+do tempo despachando closures para operações aritméticas simples. Quando o
+corpo de um `while` contém apenas aritmética, comparações, atribuições e
+comandos de controle, geramos o código-fonte de uma função Python equivalente
+(um "trace") em que as variáveis do Lox viram variáveis locais do Python:
+
+    def trace(v0, v1, v2):
+        while v0 < v1:
+            v2 = v2 + v0 * v0
+            v0 = v0 + 1.0
+        return v0, v2
+
+Como o Lox não tem inteiros, basta verificar na entrada do laço que todas as
+variáveis são floats: as operações aritméticas entre floats sempre produzem
+floats e, portanto, a suposição vale durante todo o laço. Se a verificação
+falhar, o compilador executa o laço normalmente.
+"""
+
+import math
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from .ast import (
+    And,
+    Assign,
+    BinOp,
+    Block,
+    ExprStmt,
+    If,
+    Literal,
+    Or,
+    UnaryOp,
+    Var,
+    While,
+)
+from .ctx import Ctx
+from .node import Node
+from .runtime import add, eq, ge, gt, le, lt, mul, ne, neg, not_, sub
+
+# Operadores aritméticos e de comparação com a sintaxe Python equivalente
+# quando os dois operandos são floats. A divisão fica de fora porque pode
+# levantar erros no meio do laço, antes de as variáveis serem atualizadas.
+ARITHMETIC = {add: "+", sub: "-", mul: "*"}
+COMPARISON = {lt: "<", le: "<=", gt: ">", ge: ">=", eq: "==", ne: "!="}
+
+# Endereço de uma variável: (nome, profundidade, slot), como em lox.resolver.
+Address = tuple[str, Optional[int], Optional[int]]
+
+_MISSING = object()
+
+
+class Unsupported(Exception):
+    """
+    O laço usa alguma construção que não pode ser especializada.
+    """
+
+
+@dataclass
+class Trace:
+    """
+    Gerador do código-fonte de um trace.
+    """
+
+    variables: dict[Address, str] = field(default_factory=dict)
+    assigned: set[Address] = field(default_factory=set)
+    constants: dict[str, float] = field(default_factory=dict)
+    lines: list[str] = field(default_factory=list)
+
+    def var(self, node: Var | Assign) -> str:
+        """
+        Retorna o nome da variável Python associada à variável Lox.
+        """
+        if node.forward:
+            # O endereço só é conhecido em tempo de execução.
+            raise Unsupported(node)
+        address = (node.name, node.depth, node.slot)
+        if address not in self.variables:
+            self.variables[address] = f"v{len(self.variables)}"
+        return self.variables[address]
+
+    def number(self, node: Node) -> str:
+        """
+        Traduz uma expressão que sempre produz um float.
+        """
+        if isinstance(node, Literal) and type(node.value) is float:
+            if math.isfinite(node.value):
+                return repr(node.value)
+            name = f"c{len(self.constants)}"
+            self.constants[name] = node.value
+            return name
+        if isinstance(node, Var):
+            return self.var(node)
+        if isinstance(node, UnaryOp) and node.op is neg:
+            return f"(-{self.number(node.operand)})"
+        if isinstance(node, BinOp):
+            if node.op in ARITHMETIC:
+                symbol = ARITHMETIC[node.op]
+                return f"({self.number(node.left)} {symbol} {self.number(node.right)})"
+        raise Unsupported(node)
+
+    def condition(self, node: Node) -> str:
+        """
+        Traduz uma expressão que sempre produz um bool.
+        """
+        if isinstance(node, Literal) and type(node.value) is bool:
+            return repr(node.value)
+        if isinstance(node, BinOp) and node.op in COMPARISON:
+            symbol = COMPARISON[node.op]
+            return f"({self.number(node.left)} {symbol} {self.number(node.right)})"
+        if isinstance(node, UnaryOp) and node.op is not_:
+            return f"(not {self.condition(node.operand)})"
+        if isinstance(node, And):
+            return f"({self.condition(node.left)} and {self.condition(node.right)})"
+        if isinstance(node, Or):
+            return f"({self.condition(node.left)} or {self.condition(node.right)})"
+        raise Unsupported(node)
+
+    def stmt(self, node: Node, indent: int) -> None:
+        """
+        Traduz um comando, adicionando suas linhas ao trace.
+        """
+        prefix = "    " * indent
+        if isinstance(node, ExprStmt):
+            node = node.expr
+        if isinstance(node, Assign):
+            value = self.number(node.value)
+            self.assigned.add((node.name, node.depth, node.slot))
+            self.lines.append(f"{prefix}{self.var(node)} = {value}")
+        elif isinstance(node, Block) and node.n_slots == 0:
+            self.lines.append(f"{prefix}pass")
+            for stmt in node.stmts:
+                self.stmt(stmt, indent)
+        elif isinstance(node, If):
+            self.lines.append(f"{prefix}if {self.condition(node.condition)}:")
+            self.stmt(node.then_branch, indent + 1)
+            self.lines.append(f"{prefix}else:")
+            self.stmt(node.else_branch, indent + 1)
+        elif isinstance(node, While):
+            self.lines.append(f"{prefix}while {self.condition(node.condition)}:")
+            self.stmt(node.body, indent + 1)
+        else:
+            raise Unsupported(node)
+
+
+def compile_trace(node: While) -> Optional[Callable[[Optional[list], Ctx], bool]]:
+    """
+    Tenta especializar um laço numérico.
+
+    Retorna None se o laço não puder ser especializado. Caso contrário,
+    retorna uma função `run(f, ctx)` que executa o laço e retorna True ou,
+    se alguma variável não for um float, retorna False sem executar nada.
+    """
+    trace = Trace()
+    try:
+        trace.stmt(node, 1)
+    except Unsupported:
+        return None
+
+    addresses = list(trace.variables)
+    assigned = [address for address in addresses if address in trace.assigned]
+    params = ", ".join(trace.variables[address] for address in addresses)
+    results = "".join(f"{trace.variables[address]}, " for address in assigned)
+    source = "\n".join(
+        [f"def trace({params}):", *trace.lines, f"    return ({results})"]
+    )
+    namespace = dict(trace.constants)
+    try:
+        exec(compile(source, "<lox trace>", "exec"), namespace)
+    except (SyntaxError, RecursionError, MemoryError):
+        # Expressões ou laços aninhados demais ultrapassam os limites do
+        # compilador do Python.
+        return None
+    code = namespace["trace"]
+
+    loaders = [compile_guard(*address) for address in addresses]
+    storers = [compile_store(*address) for address in assigned]
+
+    def run(f, ctx):
+        values = []
+        for load in loaders:
+            value = load(f, ctx)
+            if type(value) is not float:
+                return False
+            values.append(value)
+        for store, value in zip(storers, code(*values)):
+            store(f, ctx, value)
+        return True
+
+    return run
+
+
+def compile_guard(name: str, depth: Optional[int], slot: Optional[int]) -> Callable:
+    """
+    Compila a leitura de uma variável na entrada do trace.
+
+    Variáveis globais inexistentes não levantam erros: o laço é executado
+    normalmente e o erro acontece apenas se a variável for de fato usada.
+    """
+    if slot is None:
+        return lambda f, ctx: ctx.get(name, _MISSING)
+
+    def load(f, ctx):
+        for _ in range(depth):
+            f = f[0]
+        return f[slot]
+
+    return load
+
+
+def compile_store(name: str, depth: Optional[int], slot: Optional[int]) -> Callable:
+    """
+    Compila a escrita de uma variável na saída do trace.
+    """
+    if slot is None:
+        return lambda f, ctx, value: ctx.assign(name, value)
+
+    def store(f, ctx, value):
+        for _ in range(depth):
+            f = f[0]
+        f[slot] = value
+
+    return store
+
+
+__all__ = ["compile_trace"]
@@ -0,0 +1,75 @@
+import pytest
+
+from lox import *
+from lox.ast import _VALIDATE_CACHE, Block, Class, Function, This, Var
+from lox.errors import SemanticError
+from lox.parser import ast_parser
+
+
+class TestValidação:
+    def test_programa_é_validado_uma_única_vez(self, monkeypatch):
+        program = parse("fun f(a) { return a; }")
+        assert _VALIDATE_CACHE[id(program)] is program
+
+        calls = []
+        monkeypatch.setattr(Function, "validate_self", lambda self, cursor: calls.append(self))
+        program.validate_tree()
+        assert calls == []
+
+    def test_programa_inválido_não_é_memorizado(self):
+        program = ast_parser.parse("return 1;", start="start")
+        for _ in range(2):
+            with pytest.raises(SemanticError):
+                program.validate_tree()
+        assert id(program) not in _VALIDATE_CACHE
+
+    def test_palavra_reservada_tem_prioridade_sobre_duplicata(self):
+        with pytest.raises(SemanticError, match="reserved word 'this'"):
+            parse("fun f(a, a, this) {}")
+        with pytest.raises(SemanticError, match="Duplicate parameter name 'a'"):
+            parse("fun f(a, b, a) {}")
+
+
+def test_nomes_dos_parâmetros_são_calculados_na_construção():
+    function = Function("f", [Var("a"), Var("b")], Block([]))
+    assert function._param_names == ("a", "b")
+
+
+class TestCursor:
+    def test_escopo_envolvente_é_memorizado(self):
+        program = ast_parser.parse(
+            "class A { f() { fun g() { { print this; } } } }", start="start"
+        )
+        cursors = [c for c in program.cursor().descendants() if isinstance(c.node, This)]
+        (cursor,) = cursors
+
+        class_cursor = cursor.class_scope()
+        assert isinstance(class_cursor.node, Class)
+        assert cursor.function_scope().node.name == "g"
+        assert cursor.function_scope(root=True).node.name == "f"
+        assert all(
+            parent._enclosing[Class] is class_cursor
+            for parent in cursor.parents()
+            if parent._enclosing is not None
+        )
+        assert cursor.parent()._enclosing[Function].node.name == "g"
+
+    def test_fora_de_escopo(self):
+        program = ast_parser.parse("print 1;", start="start")
+        cursor = list(program.cursor().descendants())[-1]
+        assert not cursor.is_scoped_to(Class)
+        assert cursor.enclosing(Function) is None
+        with pytest.raises(ValueError):
+            cursor.class_scope()
+        with pytest.raises(ValueError):
+            cursor.function_scope()
+
+
+def test_métodos_compartilham_os_nomes_dos_parâmetros():
+    program = parse("class A { f(a, b) { return a + b; } }")
+    method = program.stmts[0].methods[0]
+    for ctx in (Ctx.from_dict(env := {}), Ctx.from_dict(other := {})):
+        program.stmts[0].eval(ctx)
+    assert env["A"].get_method("f").params is method._param_names
+    assert other["A"].get_method("f").params is method._param_names
+    assert env["A"]().f(1.0, 2.0) == 3.0
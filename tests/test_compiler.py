@@ -0,0 +1,272 @@
+import contextlib
+import gc
+import io
+import weakref
+
+import pytest
+
+from lox import *
+from lox.compiler import compile_program
+from lox.runtime import LoxError, LoxFunction
+
+
+def run(src: str, env: dict | None = None) -> str:
+    ctx = Ctx.from_dict({} if env is None else env)
+    with contextlib.redirect_stdout(io.StringIO()) as fd:
+        parse(src).eval(ctx)
+    return fd.getvalue()
+
+
+def test_variáveis_globais_ficam_no_contexto():
+    env = {}
+    run("var x = 1; fun f() { return x + 1; } x = f();", env)
+    assert env["x"] == 2.0
+    assert isinstance(env["f"], LoxFunction)
+
+
+def test_funções_compiladas_podem_ser_chamadas_do_python():
+    env = {}
+    run("fun f(a) { fun g(b) { return a + b; } return g(2); }", env)
+    assert env["f"](40.0) == 42.0
+
+
+def test_closures_capturam_variáveis_de_cada_iteração():
+    src = """
+    var fs = nil;
+    for (var i = 0; i < 3; i = i + 1) {
+        var j = i;
+        fun f() { print j; }
+        if (i == 1) fs = f;
+    }
+    fs();
+    """
+    assert run(src) == "1\n"
+
+
+def test_funções_enxergam_declarações_posteriores():
+    # Como no interpretador original, o corpo de uma função enxerga as
+    # variáveis do escopo envolvente que já foram declaradas no momento da
+    # chamada, inclusive as declaradas depois da própria função.
+    src = """
+    var a = "global";
+    {
+        fun show() { print a; }
+        show();
+        var a = "block";
+        show();
+    }
+    """
+    assert run(src) == "global\nblock\n"
+
+
+def test_funções_locais_mutuamente_recursivas():
+    src = """
+    fun outer() {
+        fun isEven(n) { if (n == 0) return true; return isOdd(n - 1); }
+        fun isOdd(n) { if (n == 0) return false; return isEven(n - 1); }
+        return isEven(4);
+    }
+    print outer();
+    """
+    assert run(src) == "true\n"
+
+
+def test_métodos_enxergam_classes_declaradas_depois():
+    src = """
+    {
+        class A { make() { return B(); } }
+        class B {}
+        print A().make();
+    }
+    """
+    assert run(src) == "B instance\n"
+
+
+def test_atribuição_a_declarações_posteriores():
+    src = """
+    var a = "global";
+    {
+        fun set(value) { a = value; }
+        fun get() { return a; }
+        set("antes");
+        print get();
+        var a = "bloco";
+        set("depois");
+        print a;
+    }
+    print a;
+    { fun f() { return b; } var b = 1; print f(); }
+    """
+    assert run(src) == "antes\ndepois\nantes\n1\n"
+
+
+def test_programa_pode_ser_executado_várias_vezes():
+    program = compile_program(parse("var n = n + 1;"))
+    ctx = Ctx.from_dict(env := {"n": 0.0})
+    program(ctx)
+    program(ctx)
+    assert env["n"] == 2.0
+
+
+def test_variável_global_inexistente():
+    with pytest.raises(NameError):
+        run("print x;")
+
+
+def test_veracidade_em_condições():
+    src = """
+    if (0) print "0"; else print "falso";
+    if ("") print "vazia";
+    if (nil) print "nil"; else print "nil é falso";
+    if (1 < 2) print "menor";
+    if (!nil) print "not";
+    print 0 or "x";
+    var i = 0;
+    while (i) { i = nil; print "while"; }
+    """
+    assert run(src) == "0\nvazia\nnil é falso\nmenor\nnot\n0\nwhile\n"
+
+
+def test_chamada_de_método():
+    src = """
+    class A {
+        init(x) { this.x = x; }
+        get() { return this.x; }
+        other() { return "other"; }
+    }
+    var a = A(1);
+    print a.get();
+    a.get = a.other;
+    print a.get();
+    print a.init(2) == a;
+    print a.x;
+    """
+    assert run(src) == "1\nother\ntrue\n2\n"
+
+
+def test_chamada_de_método_em_objetos_python():
+    class Obj:
+        def method(self, x):
+            return x + 1
+
+    env = {"obj": Obj()}
+    run("var y = obj.method(1);", env)
+    assert env["y"] == 2.0
+
+
+def test_return_dentro_de_comandos_compostos():
+    src = """
+    fun find(n) {
+        for (var i = 0; i < 10; i = i + 1) {
+            if (i == n) { return i; }
+        }
+        return "none";
+    }
+    fun nothing() { while (true) { return; } }
+    fun falls_through() { var x = 1; x = 2; }
+    print find(3);
+    print find(20);
+    print nothing();
+    print falls_through();
+    """
+    assert run(src) == "3\nnone\nnil\nnil\n"
+
+
+def test_operadores_fora_do_caminho_rápido():
+    class Num(float):
+        pass
+
+    env = {"x": Num(2)}
+    out = run('print "a" + "b"; print x * 2; print x < 3; print 1 == "1"; print 4 / 2;', env)
+    assert out == "ab\n4\ntrue\nfalse\n2\n"
+
+    with pytest.raises(LoxError):
+        run('print 1 + "a";')
+    with pytest.raises(LoxError):
+        run('print nil < 1;')
+
+
+def test_frames_de_blocos_reaproveitados():
+    src = """
+    fun f(n) {
+        {
+            var x = n;
+            if (n > 0) f(n - 1);
+            print x;
+        }
+    }
+    f(2);
+    var total = 0;
+    for (var i = 0; i < 3; i = i + 1) {
+        var y = i * 10;
+        { var z = y + 1; total = total + z; }
+    }
+    print total;
+    """
+    assert run(src) == "0\n1\n2\n33\n"
+
+
+def test_frames_de_blocos_são_liberados():
+    class Obj:
+        pass
+
+    refs = []
+
+    def make():
+        obj = Obj()
+        refs.append(weakref.ref(obj))
+        return obj
+
+    src = """
+    fun f() {
+        { var a = make(); }
+        for (var i = 0; i < 2; i = i + 1) { var b = make(); }
+    }
+    f();
+    """
+    env = {"make": make}
+    run(src, env)
+    gc.collect()
+    assert len(refs) == 3
+    assert all(ref() is None for ref in refs)
+
+
+def test_atribuição_em_frames_externos():
+    src = """
+    fun f() {
+        var a = 0;
+        fun g() {
+            var b = 0;
+            fun h() {
+                var c = 0;
+                { var d = 0; a = a + 1; b = b + 2; c = c + 3; d = d + 4; print d; }
+                return c;
+            }
+            print h();
+            return b;
+        }
+        print g();
+        return a;
+    }
+    print f();
+    """
+    assert run(src) == "4\n3\n2\n1\n"
+
+
+def test_método_é_obtido_antes_dos_argumentos():
+    src = """
+    class A {
+        f(x) { return "método"; }
+    }
+    fun g(x) { return "campo"; }
+    var a = A();
+    fun side(obj) { obj.f = g; return 1; }
+    print a.f(side(a));
+    print a.f(1);
+    fun noisy() { print "argumento avaliado"; return 1; }
+    a.missing(noisy());
+    """
+    with contextlib.redirect_stdout(io.StringIO()) as fd:
+        with pytest.raises(LoxError):
+            parse(src).eval(Ctx.from_dict({}))
+    assert fd.getvalue() == "método\ncampo\n"
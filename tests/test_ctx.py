@@ -0,0 +1,27 @@
+import pytest
+
+from lox import *
+from lox.ast import Super, This, Var
+
+
+def test_get_percorre_escopos():
+    ctx = Ctx.from_dict({"a": 1.0, "n": None}).push({"b": 2.0})
+    assert ctx.get("a") == 1.0
+    assert ctx.get("b") == 2.0
+    assert ctx.get("clock") is ctx["clock"]
+    assert ctx.get("x") is None
+    assert ctx.get("x", "padrão") == "padrão"
+    assert ctx.get("n", "padrão") is None
+
+
+def test_variáveis_nil_e_inexistentes():
+    ctx = Ctx.from_dict({"n": None})
+    assert Var("n").eval(ctx) is None
+    with pytest.raises(NameError):
+        Var("x").eval(ctx)
+    with pytest.raises(NameError, match="this"):
+        This().eval(ctx)
+    with pytest.raises(NameError, match="this"):
+        Super("f").eval(ctx)
+    with pytest.raises(NameError, match="super"):
+        Super("f").eval(ctx.push({"this": None}))
@@ -0,0 +1,100 @@
+import pytest
+
+from lox import *
+from lox.ast import *
+from lox.resolver import Scope, resolve
+
+
+def test_escopo_resolve_profundidade_e_slot():
+    outer = Scope()
+    a = outer.declare("a")
+    inner = Scope(outer)
+    b = inner.declare("b")
+
+    assert inner.resolve("b") == (0, b)
+    assert inner.resolve("a") == (1, a)
+    assert inner.resolve("c") is None
+
+
+def test_resolve_variáveis_locais_e_globais():
+    program = parse("var g = 1; { var a = g; { var b = a; } }")
+    resolve(program)
+
+    vardef, outer = program.stmts
+    assert vardef.slot is None
+    assert outer.n_slots == 1
+
+    a, inner = outer.stmts
+    assert a.slot == 1
+    assert a.initializer.slot is None, "g é global"
+
+    [b] = inner.stmts
+    assert (b.initializer.depth, b.initializer.slot) == (1, 1)
+
+
+def test_resolve_parâmetros_e_locais_de_funções():
+    program = parse("fun f(x, y) { var z = x; return z + y; }")
+    resolve(program)
+
+    [f] = program.stmts
+    assert f.slot is None
+    assert f.n_slots == 3
+
+    vardef, ret = f.body.stmts
+    assert vardef.slot == 3
+    assert (ret.value.left.depth, ret.value.left.slot) == (0, 3)
+    assert (ret.value.right.depth, ret.value.right.slot) == (0, 2)
+
+
+def test_declarações_posteriores_à_função():
+    program = parse("var a = 0; { fun f() { return a + b; } var a = 1; var b = 2; }")
+    resolve(program)
+
+    _, block = program.stmts
+    f, _, _ = block.stmts
+    a, b = f.body.stmts[0].value.left, f.body.stmts[0].value.right
+    assert (a.slot, a.forward) == (None, ((1, 2),)), "global até a declaração"
+    assert (b.slot, b.forward) == (None, ((1, 3),))
+
+
+def test_código_do_bloco_não_enxerga_declarações_posteriores():
+    program = parse("{ var x = a; var a = 1; }")
+    resolve(program)
+
+    [block] = program.stmts
+    x, _ = block.stmts
+    assert (x.initializer.slot, x.initializer.forward) == (None, ())
+
+
+def test_escopo_com_declarações_posteriores():
+    outer = Scope()
+    a = outer.declare("a")
+    inner = Scope(outer, parent_size=outer.size)
+    b = outer.declare("b")
+
+    assert inner.lookup("a") == ([], (1, a))
+    assert inner.lookup("b") == ([(1, b)], None)
+
+
+@pytest.mark.parametrize(
+    "src",
+    [
+        "{ fun f() { return 1; } fun f() { return 2; } }",
+        "{ var a = 1; fun a() {} }",
+        "{ class A {} class A {} }",
+        "fun f(a) { fun a() {} class a {} }",
+    ],
+)
+def test_declaração_repetida_no_mesmo_escopo(src):
+    with pytest.raises(KeyError, match="already defined"):
+        resolve(parse(src))
+
+
+def test_declarações_do_corpo_sombreiam_parâmetros():
+    program = parse("fun f(a) { print a; fun a() {} print a; }")
+    resolve(program)
+
+    [f] = program.stmts
+    before, g, after = f.body.stmts
+    assert (before.expr.depth, before.expr.slot) == (0, 1)
+    assert (after.expr.depth, after.expr.slot) == (0, g.slot) == (0, 2)
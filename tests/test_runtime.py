@@ -0,0 +1,156 @@
+import pytest
+
+from lox import *
+from lox.ast import Getattr, Var
+from lox.runtime import (
+    LoxClass,
+    LoxError,
+    LoxInstance,
+    add,
+    ge,
+    gt,
+    le,
+    lt,
+    mul,
+    neg,
+    show,
+    sub,
+    truediv,
+)
+
+
+def run(src: str) -> dict:
+    parse(src).eval(Ctx.from_dict(env := {}))
+    return env
+
+
+class TestMethodCache:
+    def test_método_herdado_é_resolvido_uma_vez(self):
+        env = run("class A { f() { return 1; } } class B < A {} class C < B {}")
+        a, c = env["A"], env["C"]
+
+        assert c.get_method("f") is a.get_method("f")
+        assert c._method_cache["f"] is a.methods["f"]
+
+    def test_método_inexistente(self):
+        env = run("class A {} class B < A {}")
+        b = env["B"]
+
+        assert b.find_method("g") is None
+        assert "g" in b._method_cache
+        with pytest.raises(LoxError):
+            b.get_method("g")
+
+    def test_classe_sem_init(self):
+        cls = LoxClass("A", {})
+        assert isinstance(cls(), LoxInstance)
+        with pytest.raises(TypeError):
+            cls(1.0)
+
+    def test_init_verifica_número_de_argumentos(self):
+        env = run("class A { init(x) { this.x = x; } }")
+        assert env["A"](1.0).fields == {"x": 1.0}
+        with pytest.raises(TypeError):
+            env["A"]()
+
+    def test_erros_no_init_não_são_silenciados(self):
+        env = run('class A { init() { this.x = -"a"; } }')
+        with pytest.raises(LoxError):
+            env["A"]()
+
+
+class TestLoxInstance:
+    def test_instâncias_não_possuem_dict(self):
+        instance = LoxInstance(LoxClass("A", {}))
+        assert LoxInstance.__slots__ == ("klass", "fields")
+        with pytest.raises(AttributeError):
+            object.__getattribute__(instance, "__dict__")
+        instance.set_field("x", 1.0)
+        assert instance.fields == {"x": 1.0}
+
+    def test_campos_têm_precedência_sobre_métodos(self):
+        env = run("""
+        class A { f() { return "método"; } }
+        var a = A();
+        var antes = a.f();
+        a.f = "campo";
+        var depois = a.f;
+        """)
+        assert env["antes"] == "método"
+        assert env["depois"] == "campo"
+
+    def test_campos_com_nomes_de_atributos_python(self):
+        env = run("""
+        class A { init() { this.klass = 1; this.fields = 2; } }
+        var a = A();
+        var x = a.klass + a.fields;
+        """)
+        assert env["x"] == 3.0
+        assert env["a"].klass.name == "A"
+
+    def test_campos_com_nomes_de_atributos_python_no_eval(self):
+        env = run("class A { init() { this.klass = 1; this.fields = 2; } } var a = A();")
+        ctx = Ctx.from_dict(env)
+        assert Getattr(Var("a"), "klass").eval(ctx) == 1.0
+        assert Getattr(Var("a"), "fields").eval(ctx) == 2.0
+
+    def test_campo_inexistente(self):
+        with pytest.raises(LoxError):
+            run("class A {} var x = A().y;")
+
+
+class TestLoxFunction:
+    def test_parâmetros_são_normalizados_para_tupla(self):
+        env = run("fun f(a, b) { return a + b; } class A { init(x) {} }")
+        assert env["f"].params == ("a", "b")
+        assert env["A"].get_method("init").params == ("x",)
+        assert env["f"](1.0, 2.0) == 3.0
+
+
+class TestShow:
+    @pytest.mark.parametrize(
+        "value, expected",
+        [
+            (None, "nil"),
+            (True, "true"),
+            (False, "false"),
+            (42.0, "42"),
+            (-0.0, "-0"),
+            (3.5, "3.5"),
+            (1e16, "1e+16"),
+            ("texto", "texto"),
+            (len, "<native fn>"),
+        ],
+    )
+    def test_representação_de_valores(self, value, expected):
+        assert show(value) == expected
+
+    def test_subclasses_de_float(self):
+        class Num(float):
+            pass
+
+        assert show(Num(2)) == "2"
+
+
+class TestOperadores:
+    class Num(float):
+        pass
+
+    @pytest.mark.parametrize("op", [add, sub, mul, truediv, lt, le, gt, ge])
+    def test_subclasses_de_float(self, op):
+        a, b = self.Num(6), self.Num(3)
+        assert op(a, b) == op(6.0, 3.0)
+        assert op(a, 3.0) == op(6.0, b)
+
+    @pytest.mark.parametrize("op", [add, sub, mul, truediv, lt, le, gt, ge])
+    def test_operandos_inválidos(self, op):
+        with pytest.raises(LoxError):
+            op(1.0, True)
+        with pytest.raises(LoxError):
+            op(None, 1.0)
+
+    def test_negação(self):
+        assert neg(2.0) == -2.0
+        assert neg(self.Num(2)) == -2.0
+        with pytest.raises(LoxError):
+            neg("2")
@@ -0,0 +1,97 @@
+import contextlib
+import io
+
+from lox import *
+from lox.ast import While
+from lox.resolver import resolve
+from lox.trace import compile_trace
+
+
+def run(src: str, env: dict | None = None) -> str:
+    ctx = Ctx.from_dict({} if env is None else env)
+    with contextlib.redirect_stdout(io.StringIO()) as fd:
+        parse(src).eval(ctx)
+    return fd.getvalue()
+
+
+def first_loop(src: str) -> While:
+    program = parse(src)
+    resolve(program)
+    return next(node for node in program.descendants() if isinstance(node, While))
+
+
+def test_laços_numéricos_são_especializados():
+    assert compile_trace(first_loop("var i = 0; while (i < 3) i = i + 1;")) is not None
+    assert compile_trace(first_loop("var i = 0; while (i < 3) { print i; i = i + 1; }")) is None
+    assert compile_trace(first_loop("var i = 0; while (i < 3) { var j = i; i = j + 1; }")) is None
+    assert compile_trace(first_loop("fun f() {} var i = 0; while (i < 3) i = i + f();")) is None
+
+
+def test_resultado_do_trace():
+    src = """
+    var total = 0;
+    for (var i = 0; i < 10; i = i + 1) {
+        var j = 0;
+        while (j < i and !(j >= 5)) {
+            if (j == 2 or j == 3) total = total - j * 2;
+            else total = total + i * j;
+            j = j + 1;
+        }
+    }
+    print total;
+    fun f(n) {
+        var s = 0;
+        { while (n > 0) { s = s + n; n = n - 1; } }
+        return s;
+    }
+    print f(100);
+    """
+    assert run(src) == "120\n5050\n"
+
+
+def test_declarações_posteriores_usam_o_laço_normal():
+    src = """
+    var a = 0;
+    {
+        fun f() { var i = 0; while (i < 3) { a = a + i; i = i + 1; } }
+        var a = 10;
+        f();
+        print a;
+    }
+    print a;
+    """
+    assert run(src) == "13\n0\n"
+
+
+def test_divisão_não_é_especializada():
+    # A divisão por zero levanta erros e as variáveis já modificadas pelo
+    # laço precisam estar atualizadas quando isso acontece.
+    assert compile_trace(first_loop("var i = 1; while (i > 0) i = i / 0;")) is None
+
+
+def test_variáveis_que_não_são_float_usam_o_laço_normal():
+    class Num(float):
+        pass
+
+    env = {"n": Num(3)}
+    src = 'var s = ""; var i = 0; while (i < n) { s = s + "a"; i = i + 1; } print s;'
+    assert run(src, env) == "aaa\n"
+    assert run("var i = 0; while (i > 0) i = undefined + 1; print i;") == "0\n"
+
+
+def test_expressões_longas_demais_usam_o_laço_normal():
+    # O trace teria mais parênteses aninhados do que o compilador do Python
+    # aceita.
+    terms = " + 1" * 250
+    src = f"var s = 0; var i = 0; while (i < 10) {{ s = s{terms}; i = i + 1; }} print s;"
+    assert compile_trace(first_loop(src)) is None
+    assert run(src) == "2500\n"
+
+
+def test_laços_aninhados_demais_usam_o_laço_normal():
+    body = "x = x + 1;"
+    for _ in range(22):
+        body = f"while (x < 0) {{ {body} }}"
+    src = f"var x = 0; var i = 0; while (i < 3) {{ {body} i = i + 1; }} print i;"
+    assert compile_trace(first_loop(src)) is None
+    assert run(src) == "3\n"